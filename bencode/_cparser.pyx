@@ -0,0 +1,132 @@
+# cython: language_level=3
+"""
+Compiled counterpart of BencodeParser.decode() from parser.py.
+
+Build in place with:
+
+    cythonize -3 -i _cparser.pyx
+
+parser.decode() picks this module up automatically when it is importable and
+falls back to the pure Python parser otherwise.
+"""
+
+from cpython.bytes cimport PyBytes_AS_STRING, PyBytes_GET_SIZE
+from libc.string cimport memchr
+
+cdef enum:
+    _I = 0x69      # 'i'
+    _L = 0x6C      # 'l'
+    _D = 0x64      # 'd'
+    _E = 0x65      # 'e'
+    _COLON = 0x3A  # ':'
+    _MINUS = 0x2D  # '-'
+    _ZERO = 0x30   # '0'
+    _NINE = 0x39   # '9'
+
+cdef inline object _parse_int(bytes data, const unsigned char *buf,
+                              Py_ssize_t start, Py_ssize_t end):
+    cdef Py_ssize_t i = start
+    cdef bint negative = False
+    cdef long long value = 0
+    cdef unsigned char byte
+
+    if i < end and buf[i] == _MINUS:
+        negative = True
+        i += 1
+    # anything that does not fit a long long or is not plain digits is left to
+    # int() so errors and edge cases match the Python parser exactly
+    if i == end or end - i > 18:
+        return int(data[start:end])
+    while i < end:
+        byte = buf[i]
+        if byte < _ZERO or byte > _NINE:
+            return int(data[start:end])
+        value = value * 10 + (byte - _ZERO)
+        i += 1
+    return -value if negative else value
+
+def decode(data, bint zero_copy=False):
+    if not isinstance(data, bytes):
+        data = bytes(data)
+
+    cdef bytes raw = <bytes>data
+    cdef const unsigned char *buf = <const unsigned char *>PyBytes_AS_STRING(raw)
+    cdef Py_ssize_t size = PyBytes_GET_SIZE(raw)
+    cdef Py_ssize_t index = 0
+    cdef Py_ssize_t colon_pos, end_pos, length
+    cdef unsigned char byte
+    cdef const unsigned char *found
+    cdef list stack = []
+    cdef list keys = []
+    cdef object value, container, length_obj
+    cdef object mv = memoryview(raw) if zero_copy else None
+
+    while True:
+        if index >= size:
+            if stack and keys[-1] is None:
+                if type(stack[-1]) is list:
+                    raise ValueError("Unterminated list")
+                raise ValueError("Unterminated dictionary")
+            raise ValueError("Unexpected end of data")
+
+        byte = buf[index]
+
+        if _ZERO <= byte <= _NINE:
+            found = <const unsigned char *>memchr(buf + index, _COLON, size - index)
+            if found == NULL:
+                raise ValueError("Invalid string format")
+            colon_pos = found - buf
+
+            length_obj = _parse_int(raw, buf, index, colon_pos)
+            index = colon_pos + 1
+
+            if length_obj > size - index:
+                raise ValueError("String length exceeds data")
+
+            length = length_obj
+            if mv is None:
+                value = raw[index:index + length]
+            else:
+                value = mv[index:index + length]
+            index += length
+        elif byte == _I:
+            index += 1  # skip 'i'
+            found = <const unsigned char *>memchr(buf + index, _E, size - index)
+            if found == NULL:
+                raise ValueError("Invalid integer format")
+            end_pos = found - buf
+
+            value = _parse_int(raw, buf, index, end_pos)
+            index = end_pos + 1
+        elif byte == _L:
+            index += 1  # skip 'l'
+            stack.append([])
+            keys.append(None)
+            continue
+        elif byte == _D:
+            index += 1  # skip 'd'
+            stack.append({})
+            keys.append(None)
+            continue
+        elif byte == _E and stack and keys[-1] is None:
+            index += 1  # skip 'e'
+            value = stack.pop()
+            keys.pop()
+        else:
+            raise ValueError(f"Invalid bencode character: {chr(byte)}")
+
+        if not stack:
+            return value
+
+        container = stack[-1]
+        if type(container) is list:
+            (<list>container).append(value)
+        elif keys[-1] is None:
+            if isinstance(value, memoryview):
+                value = bytes(value)
+            elif not isinstance(value, bytes):
+                raise ValueError("Dictionary key must be string")
+            keys[-1] = value
+        else:
+            (<dict>container)[keys[-1]] = value
+            keys[-1] = None
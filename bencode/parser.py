@@ -1,105 +1,156 @@
+from operator import itemgetter
+
+try:
+    from _cparser import decode as _c_decode
+except ImportError:
+    _c_decode = None
+
+_I = ord('i')
+_L = ord('l')
+_D = ord('d')
+_E = ord('e')
+_COLON = ord(':')
+_ZERO = ord('0')
+_NINE = ord('9')
+
+_first = itemgetter(0)
+
 class BencodeParser:
-    def __init__(self, data: bytes):
+    def __init__(self, data: bytes, debug: bool = False, zero_copy: bool = False):
         self.data = data
-        print('data', self.data)
         self.index = 0
+        self.debug = debug
+        # with zero_copy, string values are memoryview slices of data
+        # (dict keys stay bytes so they remain hashable)
+        self._mv = memoryview(data) if zero_copy else None
+        if self.debug:
+            print('data', self.data)
     
     def decode(self):
-        return self._decode_value()
-    
-    def _decode_value(self):
-        if self.index >= len(self.data):
-            raise ValueError("Unexpected end of data")
-        
-        char = chr(self.data[self.index])
-        print('char', char)
-        
-        if char.isdigit():
-            return self._decode_string()
-        elif char == 'i':
-            return self._decode_integer()
-        elif char == 'l':
-            return self._decode_list()
-        elif char == 'd':
-            return self._decode_dict()
-        else:
-            raise ValueError(f"Invalid bencode character: {char}")
-    
-    def _decode_string(self):
-        colon_pos = self.data.find(b':', self.index)
-        if colon_pos == -1:
-            raise ValueError("Invalid string format")
-        
-        length = int(self.data[self.index:colon_pos])
-        self.index = colon_pos + 1
-        
-        if self.index + length > len(self.data):
-            raise ValueError("String length exceeds data")
+        data = self.data
+        mv = self._mv
+        size = len(data)
+        index = self.index
+        # open lists/dicts, innermost last; keys[n] holds the pending key for
+        # stack[n] when it is a dict awaiting its value, otherwise None
+        stack = []
+        keys = []
         
-        result = self.data[self.index:self.index + length]
-        self.index += length
-        return result
+        while True:
+            if index >= size:
+                if stack and keys[-1] is None:
+                    if isinstance(stack[-1], list):
+                        raise ValueError("Unterminated list")
+                    raise ValueError("Unterminated dictionary")
+                raise ValueError("Unexpected end of data")
+            
+            byte = data[index]
+            if self.debug:
+                print('char', chr(byte))
+            
+            if _ZERO <= byte <= _NINE:
+                colon_pos = data.find(_COLON, index)
+                if colon_pos == -1:
+                    raise ValueError("Invalid string format")
+                
+                length = self._parse_int(index, colon_pos)
+                index = colon_pos + 1
+                
+                if index + length > size:
+                    raise ValueError("String length exceeds data")
+                
+                if mv is None:
+                    value = data[index:index + length]
+                else:
+                    value = mv[index:index + length]
+                index += length
+            elif byte == _I:
+                index += 1  # skip 'i'
+                end_pos = data.find(_E, index)
+                if end_pos == -1:
+                    raise ValueError("Invalid integer format")
+                
+                value = self._parse_int(index, end_pos)
+                index = end_pos + 1
+            elif byte == _L:
+                index += 1  # skip 'l'
+                stack.append([])
+                keys.append(None)
+                continue
+            elif byte == _D:
+                index += 1  # skip 'd'
+                stack.append({})
+                keys.append(None)
+                continue
+            elif byte == _E and stack and keys[-1] is None:
+                index += 1  # skip 'e'
+                value = stack.pop()
+                keys.pop()
+            else:
+                raise ValueError(f"Invalid bencode character: {chr(byte)}")
+            
+            if not stack:
+                self.index = index
+                return value
+            
+            container = stack[-1]
+            if isinstance(container, list):
+                container.append(value)
+            elif keys[-1] is None:
+                if isinstance(value, memoryview):
+                    value = bytes(value)
+                elif not isinstance(value, bytes):
+                    raise ValueError("Dictionary key must be string")
+                keys[-1] = value
+            else:
+                container[keys[-1]] = value
+                keys[-1] = None
     
-    def _decode_integer(self):
-        self.index += 1  # skip 'i'
-        end_pos = self.data.find(b'e', self.index)
-        if end_pos == -1:
-            raise ValueError("Invalid integer format")
-        
-        result = int(self.data[self.index:end_pos])
-        self.index = end_pos + 1
-        return result
-    
-    def _decode_list(self):
-        self.index += 1  # skip 'l'
-        result = []
-        
-        while self.index < len(self.data) and chr(self.data[self.index]) != 'e':
-            result.append(self._decode_value())
-        
-        if self.index >= len(self.data):
-            raise ValueError("Unterminated list")
-        
-        self.index += 1  # skip 'e'
-        return result
-    
-    def _decode_dict(self):
-        self.index += 1  # skip 'd'
-        result = {}
-        
-        while self.index < len(self.data) and chr(self.data[self.index]) != 'e':
-            key = self._decode_value()
-            if not isinstance(key, bytes):
-                raise ValueError("Dictionary key must be string")
-            value = self._decode_value()
-            result[key] = value
-        
-        if self.index >= len(self.data):
-            raise ValueError("Unterminated dictionary")
-        
-        self.index += 1  # skip 'e'
-        return result
+    def _parse_int(self, start: int, end: int) -> int:
+        # single digits are the most common case and skip the slice + int()
+        if end - start == 1:
+            byte = self.data[start]
+            if _ZERO <= byte <= _NINE:
+                return byte - _ZERO
+        return int(self.data[start:end])
 
-def encode(obj):
+def _encode_into(obj, out: bytearray, sort_keys: bool = True):
     if isinstance(obj, bytes):
-        return str(len(obj)).encode() + b':' + obj
+        out += b'%d:' % len(obj)
+        out += obj
+    elif isinstance(obj, memoryview):
+        out += b'%d:' % obj.nbytes
+        out += obj
     elif isinstance(obj, str):
-        return encode(obj.encode())
+        _encode_into(obj.encode(), out, sort_keys)
     elif isinstance(obj, int):
-        return b'i' + str(obj).encode() + b'e'
+        out += b'i%de' % obj
     elif isinstance(obj, list):
-        return b'l' + b''.join(encode(item) for item in obj) + b'e'
+        out += b'l'
+        for item in obj:
+            _encode_into(item, out, sort_keys)
+        out += b'e'
     elif isinstance(obj, dict):
-        items = []
-        for key in sorted(obj.keys()):
-            items.append(encode(key))
-            items.append(encode(obj[key]))
-        return b'd' + b''.join(items) + b'e'
+        out += b'd'
+        items = sorted(obj.items(), key=_first) if sort_keys else obj.items()
+        for key, value in items:
+            _encode_into(key, out, sort_keys)
+            _encode_into(value, out, sort_keys)
+        out += b'e'
     else:
         raise ValueError(f"Cannot encode type: {type(obj)}")
 
-def decode(data: bytes):
-    parser = BencodeParser(data)
+def encode(obj, sort_keys: bool = True):
+    # pass sort_keys=False only when every dict is already in key order,
+    # e.g. when re-encoding the output of decode()
+    out = bytearray()
+    _encode_into(obj, out, sort_keys)
+    return bytes(out)
+
+def decode(data: bytes, zero_copy: bool = False):
+    if _c_decode is not None:
+        return _c_decode(data, zero_copy)
+    parser = BencodeParser(data, zero_copy=zero_copy)
     return parser.decode()
 
 # Example usage
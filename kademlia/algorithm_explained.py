@@ -17,6 +17,7 @@ XOR DISTANCE PROPERTIES:
 """
 
 from kademlia import KademliaNode, KademliaDHT
+import heapq
 import random
 
 def demonstrate_xor_distance():
@@ -94,7 +95,7 @@ def demonstrate_lookup_process():
     # Store data on node closest to key
     target_key = "example_key"
     key_hash = 0x35  # Simulated hash
-    closest_node = min(nodes, key=lambda n: n.distance(n.node_id, key_hash))
+    closest_node = min(nodes, key=lambda n: n.node_id ^ key_hash)
     closest_node.store(target_key, "example_value")
     
     print(f"Target key hash: 0x{key_hash:02x}")
@@ -178,7 +179,7 @@ def demonstrate_fault_tolerance():
     key_hash = hash(key) & 0xFF
     
     # Find k closest nodes and store on all of them
-    storage_nodes = sorted(nodes, key=lambda n: n.distance(n.node_id, key_hash))[:4]
+    storage_nodes = heapq.nsmallest(4, nodes, key=lambda n: n.node_id ^ key_hash)
     
     print(f"Storing '{key}' on {len(storage_nodes)} nodes for redundancy:")
     for node in storage_nodes:
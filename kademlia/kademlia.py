@@ -1,54 +1,106 @@
 import hashlib
+import heapq
+import operator
 import random
-from typing import Dict, List, Optional
+from collections import OrderedDict, deque
+from functools import lru_cache
+from itertools import chain
+from typing import Deque, Dict, List, Optional, Union
+
+@lru_cache(maxsize=1024)
+def _key_hash(key: Union[str, bytes]) -> int:
+    data = key if isinstance(key, bytes) else key.encode()
+    return int.from_bytes(hashlib.sha1(data).digest(), 'big')
 
 class KademliaNode:
-    def __init__(self, node_id: Optional[int] = None, k: int = 20):
-        self.node_id = node_id or random.getrandbits(160)
+    def __init__(self, node_id: Optional[Union[int, bytes]] = None, k: int = 20):
+        # ids are kept as ints so XOR and bit_length stay single C calls;
+        # 20-byte wire ids are converted once here
+        if node_id is None:
+            node_id = random.getrandbits(160)
+        elif isinstance(node_id, bytes):
+            node_id = int.from_bytes(node_id, 'big')
+        self.node_id = node_id
         self.k = k  # bucket size
-        self.buckets: List[List[int]] = [[] for _ in range(160)]  # 160-bit address space
+        # 160-bit address space; only non-empty buckets are allocated, each
+        # an LRU of node ids ordered least to most recently seen
+        self._buckets: Dict[int, "OrderedDict[int, None]"] = {}
+        # nodes seen while their bucket was full, newest last
+        self.replacements: Dict[int, Deque[int]] = {}
+        # flattened bucket contents, rebuilt lazily after membership changes
+        self._flat: List[int] = []
+        self._dirty = False
         self.storage: Dict[int, str] = {}
     
-    def distance(self, id1: int, id2: int) -> int:
-        return id1 ^ id2
+    @property
+    def buckets(self) -> List[List[int]]:
+        return [list(self._buckets.get(i, ())) for i in range(160)]
+    
+    @property
+    def node_bytes(self) -> bytes:
+        return self.node_id.to_bytes(20, 'big')
+    
+    # XOR metric; bound straight to the builtin so calls skip a Python frame
+    distance = staticmethod(operator.xor)
     
     def bucket_index(self, node_id: int) -> int:
-        distance = self.distance(self.node_id, node_id)
-        return distance.bit_length() - 1 if distance > 0 else 0
+        # a zero distance falls back to 1, whose bit_length maps to bucket 0
+        return ((self.node_id ^ node_id) or 1).bit_length() - 1
     
     def add_node(self, node_id: int):
         if node_id == self.node_id:
             return
         
         bucket_idx = self.bucket_index(node_id)
-        bucket = self.buckets[bucket_idx]
+        bucket = self._buckets.get(bucket_idx)
+        if bucket is None:
+            bucket = self._buckets[bucket_idx] = OrderedDict()
         
         if node_id in bucket:
-            bucket.remove(node_id)
-            bucket.append(node_id)  # move to end (most recent)
+            bucket.move_to_end(node_id)  # most recent
         elif len(bucket) < self.k:
-            bucket.append(node_id)
+            bucket[node_id] = None
+            self._dirty = True
         else:
-            # bucket full - in real implementation, ping oldest node
-            bucket.pop(0)
-            bucket.append(node_id)
+            # bucket full - keep the newcomer as a replacement until a
+            # contact in this bucket fails a liveness check
+            cache = self.replacements.get(bucket_idx)
+            if cache is None:
+                cache = self.replacements[bucket_idx] = deque(maxlen=self.k)
+            elif node_id in cache:
+                cache.remove(node_id)
+            cache.append(node_id)
+    
+    def evict_stale(self, node_id: int):
+        bucket_idx = self.bucket_index(node_id)
+        bucket = self._buckets.get(bucket_idx)
+        if bucket is None or node_id not in bucket:
+            return
+        
+        del bucket[node_id]
+        cache = self.replacements.get(bucket_idx)
+        if cache:
+            bucket[cache.pop()] = None  # most recently seen replacement
+        elif not bucket:
+            del self._buckets[bucket_idx]
+        self._dirty = True
     
     def find_closest_nodes(self, target_id: int, count: Optional[int] = None) -> List[int]:
         count = count or self.k
-        all_nodes = []
-        
-        for bucket in self.buckets:
-            all_nodes.extend(bucket)
-        
-        all_nodes.sort(key=lambda x: self.distance(target_id, x))
-        return all_nodes[:count]
+        if self._dirty:
+            self._flat = list(chain.from_iterable(self._buckets.values()))
+            self._dirty = False
+        # partial O(n log k) selection; target_id.__xor__ is the XOR distance
+        # as a C-level key function, so no Python frame runs per node
+        return heapq.nsmallest(count, self._flat, key=target_id.__xor__)
+    
+    def store(self, key: Union[str, bytes], value: str):
+        self.storage[_key_hash(key)] = value
     
-    def store(self, key: str, value: str):
-        key_hash = int(hashlib.sha1(key.encode()).hexdigest(), 16)
-        self.storage[key_hash] = value
+    def find_value(self, key: Union[str, bytes]) -> Optional[str]:
+        return self._find_value_by_hash(_key_hash(key))
     
-    def find_value(self, key: str) -> Optional[str]:
-        key_hash = int(hashlib.sha1(key.encode()).hexdigest(), 16)
+    def _find_value_by_hash(self, key_hash: int) -> Optional[str]:
         return self.storage.get(key_hash)
 
 class KademliaDHT:
@@ -63,15 +115,15 @@ class KademliaDHT:
             new_node.add_node(bootstrap_node_id)
             self.nodes[bootstrap_node_id].add_node(new_node.node_id)
     
-    def lookup(self, node_id: int, target_key: str) -> Optional[str]:
+    def lookup(self, node_id: int, target_key: Union[str, bytes]) -> Optional[str]:
         if node_id not in self.nodes:
             return None
         
         node = self.nodes[node_id]
-        key_hash = int(hashlib.sha1(target_key.encode()).hexdigest(), 16)
+        key_hash = _key_hash(target_key)
         
         # Check local storage first
-        value = node.find_value(target_key)
+        value = node._find_value_by_hash(key_hash)
         if value:
             return value
         
@@ -79,7 +131,7 @@ class KademliaDHT:
         closest = node.find_closest_nodes(key_hash)
         for close_node_id in closest:
             if close_node_id in self.nodes:
-                value = self.nodes[close_node_id].find_value(target_key)
+                value = self.nodes[close_node_id]._find_value_by_hash(key_hash)
                 if value:
                     return value
         